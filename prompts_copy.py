@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional
+
+# ==============================================================================
+#           PROMPTS E ESTRUTURA DO GERADOR DE COPY PARA WEBSITE
+# ==============================================================================
+# Sem dependências externas: usado pelo modo interativo (CopyWriting.py) e pelo servidor HTTP (servidor.py).
+
+CAMPOS_BRIEFING = ['nome_marca', 'produto_servico', 'publico_alvo', 'diferenciais', 'tom_de_voz']
+
+
+def formatar_fontes_para_prompt(fontes: List[Dict[str, str]]) -> str:
+    contexto_formatado = "--- CONTEXTO EXTERNO (Pesquisa) ---\n"
+    if not fontes:
+        return "Nenhum contexto externo encontrado.\n"
+    for i, fonte in enumerate(fontes, 1):
+        contexto_formatado += f"Fonte {i}: {fonte['titulo']}\nSnippet: {fonte['snippet']}\nURL: {fonte['url']}\n\n"
+    return contexto_formatado
+
+
+def criar_prompt_mestre(prompt_especifico: str, persona: str = "copywriter") -> str:
+    """Anexa uma instrução de sistema rigorosa ao prompt da seção."""
+    if persona == "copywriter":
+        instrucao_sistema = "ATENÇÃO: Sua identidade é de um Copywriter Sênior, especialista em escrita persuasiva e otimização para conversão (CRO). Sua missão é gerar APENAS o conteúdo textual para a seção do website solicitada, seguindo estas regras ESTRITAS:\n1.  **FOCO TOTAL NO CLIENTE:** Use as informações fornecidas sobre a marca, produto, público e diferenciais como base principal. O CONTEXTO DO CLIENTE é mais importante que as fontes externas.\n2.  **PERSUASÃO E CONVERSÃO:** Seu objetivo é engajar o leitor e levá-lo à ação. Use técnicas de copywriting (gatilhos mentais, AIDA, PAS), foque em benefícios e resultados para o cliente, não apenas características.\n3.  **STORYTELLING:** Quando apropriado (ex: seção \"Sobre Nós\"), incorpore elementos de storytelling para conectar emocionalmente com o leitor.\n4.  **CLAREZA E OBJETIVIDADE:** Use linguagem clara, direta e acessível ao público-alvo. Evite jargões desnecessários. Parágrafos curtos.\n5.  **TOM DE VOZ DA MARCA:** Adapte seu estilo de escrita ao tom de voz desejado (informado no contexto).\n6.  **NÃO GERE TÍTULOS DE SEÇÃO:** Comece a resposta DIRETAMENTE com o conteúdo (headline, parágrafo, etc.). O script principal cuidará da estrutura.\n7.  **SEM SAUDAÇÕES/METATEXTO:** Não use frases como \"Com certeza\", \"Aqui está a copy\", etc."
+    elif persona == "editor_copy":
+        instrucao_sistema = "ATENÇÃO: Você é um Editor de Copy Sênior, focado em conversão. Revise a copy fornecida e ofereça sugestões CRÍTICAS e ACIONÁVEIS para AUMENTAR A PERSUASÃO e a CLAREZA. Para cada sugestão, forneça:\n1.  **Ponto a Melhorar:** (Ex: Headline pouco impactante, CTA fraco, Foco excessivo em características)\n2.  **Sugestão Específica:** (Ex: Reescrever headline focando no principal benefício; Tornar o CTA mais específico e urgente; Reformular parágrafo para destacar resultados)\n3.  **Justificativa:** (Por que a mudança aumentaria a conversão)\n\nResponda DIRETAMENTE com 2 a 3 sugestões, seguindo o formato."
+    elif persona == "tradutor_en":
+        return f"Translate the following website copy text to English, preserving the original Markdown formatting (headings, bold text, bullet points). Maintain a persuasive and brand-aligned tone. Respond only with the translated text.\n\n---\n\n{prompt_especifico}"
+    elif persona == "tradutor_es":
+        return f"Traduce el siguiente texto de copywriting para sitio web al español, conservando el formato Markdown original (encabezados, negritas, viñetas). Mantén un tono persuasivo y alineado a la marca. Responde únicamente con el texto traducido.\n\n---\n\n{prompt_especifico}"
+
+    return f"{instrucao_sistema}\n--- CONTEXTO DO CLIENTE E INSTRUÇÃO ESPECÍFICA ---\n{prompt_especifico}"
+
+
+def formatar_contexto_cliente(info_cliente: Dict, objetivo_principal: Optional[str] = None) -> str:
+    contexto = f"Contexto do Cliente:\nMarca: {info_cliente['nome_marca']}\nPúblico: {info_cliente['publico_alvo']}\nProduto/Serviço: {info_cliente['produto_servico']}\nDiferenciais: {info_cliente['diferenciais']}\nTom de Voz: {info_cliente['tom_de_voz']}"
+    if objetivo_principal is not None:
+        contexto += f"\nObjetivo Principal do Site: {objetivo_principal}"
+    return contexto
+
+
+def montar_estrutura_website(info_cliente: Dict, objetivo_principal: str) -> List[Dict]:
+    """Páginas do site; cada seção traz o termo de pesquisa e o prompt (fontes, contexto, cliente)."""
+    return [
+        {"titulo_pagina": "Página Inicial (Home)", "secoes": [
+            {"titulo": "Headline Principal",
+             "pesquisa": f"headlines persuasivas para {info_cliente['produto_servico']}", "prompt": lambda f, c,
+                                                                                                           cli: f"Crie 3 opções de Headlines (títulos principais) magnéticas e focadas em benefícios para a Home Page, considerando o objetivo de '{objetivo_principal}'.\n\n{f}"},
+            {"titulo": "Sub-headline e Introdução",
+             "pesquisa": f"introdução engajadora website {info_cliente['nome_marca']}", "prompt": lambda f, c,
+                                                                                                         cli: f"Desenvolva uma sub-headline que complemente a headline principal e um parágrafo introdutório (2-3 linhas) que prenda a atenção do público '{cli['publico_alvo']}', apresentando o problema que '{cli['produto_servico']}' resolve.\n\n{f}"},
+            {"titulo": "Seção de Benefícios Chave",
+             "pesquisa": f"como apresentar benefícios {info_cliente['produto_servico']}", "prompt": lambda f, c,
+                                                                                                           cli: f"Crie uma seção curta destacando os 2-3 principais benefícios de '{cli['produto_servico']}', focando nos resultados para o cliente '{cli['publico_alvo']}'. Use bullet points se apropriado.\n\n{f}"},
+            {"titulo": "Chamada para Ação (CTA) Principal", "pesquisa": f"exemplos CTA eficaz {objetivo_principal}",
+             "prompt": lambda f, c,
+                              cli: f"Crie 2 opções de CTAs claros e diretos para a Home Page, alinhados com o objetivo de '{objetivo_principal}'.\n\n{f}"}
+        ]},
+        {"titulo_pagina": "Sobre Nós", "secoes": [
+            {"titulo": "Nossa História / Missão",
+             "pesquisa": f"storytelling para página sobre nós {info_cliente['nome_marca']}", "prompt": lambda f, c,
+                                                                                                              cli: f"Desenvolva o texto para a seção 'Sobre Nós'. Conte a história da marca '{cli['nome_marca']}' ou sua missão de forma envolvente (storytelling), conectando com os valores do público '{cli['publico_alvo']}'. Use o tom de voz '{cli['tom_de_voz']}'.\n\n{f}"},
+            {"titulo": "Diferenciais e Valores",
+             "pesquisa": f"apresentar diferenciais empresa {info_cliente['nome_marca']}", "prompt": lambda f, c,
+                                                                                                           cli: f"Crie um texto curto reforçando os diferenciais '{cli['diferenciais']}' e os valores da marca '{cli['nome_marca']}'.\n\n{f}"}
+        ]},
+        {"titulo_pagina": "Oferta do Produto/Serviço", "secoes": [
+            {"titulo": "Headline da Oferta",
+             "pesquisa": f"headline persuasiva oferta {info_cliente['produto_servico']}", "prompt": lambda f, c,
+                                                                                                           cli: f"Crie 2 opções de headlines focadas na oferta principal de '{cli['produto_servico']}', destacando o maior benefício ou diferencial.\n\n{f}"},
+            {"titulo": "Descrição Persuasiva", "pesquisa": f"copy de vendas para {info_cliente['produto_servico']}",
+             "prompt": lambda f, c,
+                              cli: f"Elabore a copy de vendas principal para '{cli['produto_servico']}'. Detalhe como ele funciona, mas foque nos **resultados e transformações** que ele entrega para '{cli['publico_alvo']}'. Use storytelling se aplicável e reforce os diferenciais '{cli['diferenciais']}'. O objetivo é a conversão ('{objetivo_principal}').\n\n{f}"},
+            {"titulo": "Prova Social (Ex: Testemunhos)", "pesquisa": f"exemplos prova social website",
+             "prompt": lambda f, c,
+                              cli: f"Crie 2-3 modelos curtos de testemunhos fictícios (mas realistas) de clientes do público '{cli['publico_alvo']}' satisfeitos com '{cli['produto_servico']}'.\n\n{f}"},
+            {"titulo": "CTA da Oferta", "pesquisa": f"CTA para página de vendas {objetivo_principal}",
+             "prompt": lambda f, c,
+                              cli: f"Crie 2 opções de CTAs fortes e claros para a página da oferta, incentivando a ação ('{objetivo_principal}').\n\n{f}"}
+        ]},
+    ]
+
+
+def montar_prompt_secao(secao: Dict, fontes_fmt: str, contexto_cumulativo: str, info_cliente: Dict,
+                        objetivo_principal: str) -> str:
+    return f"{formatar_contexto_cliente(info_cliente, objetivo_principal)}\n\n{fontes_fmt}\n\nInstrução Específica para esta seção ({secao['titulo']}):\n{secao['prompt'](fontes_fmt, contexto_cumulativo[-6000:], info_cliente)}\n\nCONTEXTO JÁ ESCRITO NO SITE:\n{contexto_cumulativo[-6000:]}"
+
+
+def montar_prompt_revisao(contexto_atual: str, info_cliente: Dict) -> str:
+    return f"{formatar_contexto_cliente(info_cliente)}\n\nCOPY GERADA ATÉ AGORA (Últimos trechos):\n{contexto_atual[-6000:]}\n\nSiga rigorosamente as instruções da sua persona de Editor de Copy Sênior. Forneça sugestões para aumentar a persuasão e clareza."
+
+
+def montar_termo_pesquisa_ad_hoc(info_cliente: Dict) -> str:
+    return f"concorrentes {info_cliente['nome_marca']} OU {info_cliente['produto_servico']}"
+
+
+def montar_prompt_ad_hoc(instrucao_especifica: str, fontes_fmt: str, contexto_atual: str, info_cliente: Dict) -> str:
+    return f"{formatar_contexto_cliente(info_cliente)}\n\n{fontes_fmt}\n\nInstrução Específica para esta seção: {instrucao_especifica}\n\nCONTEXTO JÁ ESCRITO NO SITE:\n{contexto_atual[-8000:]}"
@@ -0,0 +1,90 @@
+from typing import Dict, List
+
+# ==============================================================================
+#           PROMPTS E ESTRUTURA DO GERADOR DE DOCUMENTOS
+# ==============================================================================
+# Sem dependências externas: usado pelo modo interativo (main.py) e pelo servidor HTTP (servidor.py).
+
+
+def formatar_fontes_para_prompt(fontes: List[Dict[str, str]]) -> str:
+    contexto_formatado = "--- FONTES DE PESQUISA PARA ESTA SEÇÃO ---\n"
+    for i, fonte in enumerate(fontes, 1):
+        contexto_formatado += f"Fonte {i}: {fonte['titulo']}\nSnippet: {fonte['snippet']}\nURL: {fonte['url']}\n\n"
+    return contexto_formatado
+
+
+def criar_prompt_mestre(prompt_especifico: str, persona: str = "analista") -> str:
+    """Anexa uma instrução de sistema rigorosa ao prompt da seção."""
+    if persona == "analista":
+        instrucao_sistema = "ATENÇÃO: Sua identidade é de um pesquisador sênior e analista crítico. Sua missão é gerar APENAS o conteúdo para a seção solicitada, seguindo estas regras ESTRITAS:\n1.  **NÃO GERE TÍTULOS:** Comece sua resposta DIRETAMENTE com o primeiro parágrafo do texto.\n2.  **BASE ESTRITA NAS FONTES:** Baseie TODAS as suas afirmações EXCLUSIVAMENTE nas \"FONTES DE PESQUISA\" e no \"CONTEXTO JÁ ESCRITO\".\n3.  **PROFUNDIDADE E SÍNTESE:** Sintetize as informações das fontes para construir um argumento coeso e aprofundado.\n4.  **PROIBIDO INVENTAR:** NÃO invente informações, dados ou exemplos que não estejam nas fontes.\n5.  **SEM SAUDAÇÕES:** NÃO use frases como \"Com certeza\", \"Aqui está\", etc."
+    elif persona == "editor":
+        instrucao_sistema = "ATENÇÃO: Você é um Editor Sênior. Revise o documento fornecido e ofereça sugestões CRÍTICAS e ACIONÁVEIS. Para cada sugestão, forneça três itens em um formato claro: 1. **Título Sugerido:** (Um título H2 conciso), 2. **Termo de Pesquisa:** (Uma string de pesquisa otimizada para Google), 3. **Justificativa:** (Uma breve análise da lacuna). Responda DIRETAMENTE com 2 a 3 sugestões."
+    elif persona == "referencias":
+        return f"Você é um assistente de formatação bibliográfica. Organize a lista de fontes brutas a seguir em uma seção de 'Referências' limpa e profissional. Formate cada item com o título e o link de forma clara. Agrupe em ordem alfabética pelo título.\n\nFONTES BRUTAS:\n{prompt_especifico}"
+    elif persona == "tradutor_en":
+        return f"Translate the following text to English, preserving the original Markdown formatting. Respond only with the translated text.\n\n---\n\n{prompt_especifico}"
+    elif persona == "tradutor_es":
+        return f"Traduce el siguiente texto al español, conservando el formato Markdown original. Responde únicamente con el texto traducido.\n\n---\n\n{prompt_especifico}"
+    return f"{instrucao_sistema}\n--- INSTRUÇÃO ESPECÍFICA ---\n{prompt_especifico}"
+
+
+def montar_estrutura_documento(tema_principal: str) -> List[Dict]:
+    """Estrutura universal de 5 capítulos; cada seção traz o termo de pesquisa e o prompt (fontes, contexto)."""
+    return [
+        {"titulo_parte": "Introdução e Fundamentos", "secoes": [
+            {"titulo": "Introdução Abrangente", "pesquisa": f"o que é {tema_principal} guia completo",
+             "prompt": lambda f,
+                              c: f"Elabore uma Introdução aprofundada (3-4 parágrafos) para um manual sobre '{tema_principal}'. A introdução deve definir o conceito, apresentar a tese central, justificar a importância do tema e apresentar a estrutura do manual.\n\n{f}"},
+            {"titulo": "Contexto Histórico e Evolução", "pesquisa": f"história e evolução de {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Analise criticamente a evolução de '{tema_principal}', comparando abordagens tradicionais com as mais recentes inovações.\n\nCONTEXTO:\n{c}\n\n{f}"},
+        ]},
+        {"titulo_parte": "Análise dos Componentes Principais", "secoes": [
+            {"titulo": "Conceitos e Mecanismos Chave",
+             "pesquisa": f"principais conceitos e mecanismos de {tema_principal}", "prompt": lambda f,
+                                                                                                    c: f"Analise criticamente os principais conceitos ou componentes de '{tema_principal}'. Explique o papel estratégico de cada um.\n\nCONTEXTO:\n{c}\n\n{f}"},
+            {"titulo": "Tecnologias Habilitadoras", "pesquisa": f"tecnologias habilitadoras de {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Descreva as principais tecnologias que sustentam '{tema_principal}' e como elas interagem.\n\nCONTEXTO:\n{c}\n\n{f}"},
+        ]},
+        {"titulo_parte": "Aplicações Práticas e Estudos de Caso", "secoes": [
+            {"titulo": "Aplicações Setoriais", "pesquisa": f"aplicações práticas de {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Explore diversas aplicações práticas de '{tema_principal}' em diferentes setores da indústria ou sociedade.\n\nCONTEXTO:\n{c}\n\n{f}"},
+            {"titulo": "Estudo de Caso Aprofundado", "pesquisa": f"estudo de caso detalhado {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Elabore uma análise de um estudo de caso sobre a aplicação de '{tema_principal}'. Descreva o desafio, a solução e analise criticamente os resultados.\n\nCONTEXTO:\n{c}\n\n{f}"},
+        ]},
+        {"titulo_parte": "Desafios, Ética e Implementação", "secoes": [
+            {"titulo": "Desafios e Barreiras à Adoção", "pesquisa": f"desafios e barreiras de {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Analise os principais desafios (técnicos, culturais, financeiros) para a implementação ou adoção de '{tema_principal}'.\n\nCONTEXTO:\n{c}\n\n{f}"},
+            {"titulo": "Considerações Éticas e de Segurança", "pesquisa": f"ética e segurança em {tema_principal}",
+             "prompt": lambda f,
+                              c: f"Elabore uma análise crítica sobre os riscos (privacidade, viés, segurança) ao se trabalhar com '{tema_principal}' e ofereça recomendações para mitigá-los.\n\nCONTEXTO:\n{c}\n\n{f}"},
+        ]},
+        {"titulo_parte": "Conclusão e Visão de Futuro", "secoes": [
+            {"titulo": "Análise de Tendências e Inovações Futuras",
+             "pesquisa": f"tendências futuras e inovações de {tema_principal}", "prompt": lambda f,
+                                                                                                 c: f"Elabore uma análise das tendências futuras para '{tema_principal}' nos próximos 5 a 10 anos.\n\nCONTEXTO:\n{c}\n\n{f}"},
+            {"titulo": "Conclusão e Recomendações Finais",
+             "pesquisa": f"conclusão e recomendações sobre {tema_principal}", "prompt": lambda f,
+                                                                                               c: f"Elabore uma síntese de todo o documento, recapitulando os argumentos principais. Finalize com uma lista de recomendações acionáveis para diferentes públicos.\n\nCONTEXTO:\n{c}\n\n{f}"},
+        ]}
+    ]
+
+
+def montar_prompt_revisao(contexto_atual: str) -> str:
+    return f"Revise o documento a seguir, que está em andamento. Siga rigorosamente as instruções da sua persona de Editor Sênior.\n\nDOCUMENTO A SER REVISADO:\n{contexto_atual[-10000:]}"
+
+
+def montar_prompt_ad_hoc(titulo_secao: str, fontes_fmt: str, contexto_atual: str) -> str:
+    return f"Elabore uma seção aprofundada sobre o tema '{titulo_secao}'. Analise criticamente o tema, sintetize as fontes e conecte-o ao contexto maior do documento.\n\n{fontes_fmt}\nCONTEXTO JÁ ESCRITO:\n{contexto_atual[-8000:]}"
+
+
+def montar_fontes_brutas(referencias: List[Dict[str, str]]) -> str:
+    fontes_brutas = ""
+    for ref in referencias:
+        fontes_brutas += f"Título: {ref['titulo']}\nURL: {ref['url']}\n\n"
+    return fontes_brutas
+
@@ -0,0 +1,298 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Deque, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# --- Constantes de Configuração ---
+# Códigos HTTP que indicam falha passageira (vale a pena tentar de novo).
+CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+# Amostras mínimas antes de confiar no p95 para disparar requisições duplicadas (hedge).
+AMOSTRAS_MINIMAS_HEDGE = 5
+# Espera mínima antes de um hedge: a duplicata é uma segunda requisição cobrada, não um cancelamento.
+ATRASO_MINIMO_HEDGE = 10.0
+
+
+def _iniciar_em_thread(funcao: Callable[[], T]) -> "Future[T]":
+    """Executa `funcao` numa thread daemon e devolve o Future do resultado.
+
+    Threads não podem ser interrompidas: a chamada "perdedora" de um hedge tem o resultado
+    descartado (o timeout do SDK a encerra). Por serem daemon, uma requisição pendurada não
+    impede o processo de sair após um Ctrl+C, ao contrário de um ThreadPoolExecutor.
+    """
+    futuro: "Future[T]" = Future()
+
+    def alvo() -> None:
+        if not futuro.set_running_or_notify_cancel():
+            return
+        try:
+            futuro.set_result(funcao())
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    threading.Thread(target=alvo, name="resiliencia", daemon=True).start()
+    return futuro
+
+
+# ==============================================================================
+#           ERROS TIPADOS
+# ==============================================================================
+
+class ErroAPI(Exception):
+    """Erro base de qualquer chamada externa (Gemini, Google Search)."""
+
+    def __init__(self, chave: str, mensagem: str):
+        super().__init__(f"[{chave}] {mensagem}")
+        self.chave = chave
+
+
+class PrazoExcedido(ErroAPI):
+    """A chamada não terminou dentro do prazo (deadline) configurado."""
+
+
+class CircuitoAberto(ErroAPI):
+    """O disjuntor do endpoint está aberto; a chamada nem chegou a ser feita."""
+
+
+class TentativasEsgotadas(ErroAPI):
+    """Todas as tentativas falharam com erros transitórios (cota, 5xx, timeout)."""
+
+
+class ErroPermanente(ErroAPI):
+    """Erro que não adianta repetir (requisição inválida, conteúdo bloqueado, etc.)."""
+
+
+def eh_transitorio(erro: BaseException) -> bool:
+    """Classifica o erro sem depender das bibliotecas do Google (usa o código HTTP)."""
+    if isinstance(erro, (TimeoutError, ConnectionError, PrazoExcedido)):
+        return True
+    codigo = getattr(erro, "code", None)
+    if codigo is None:
+        resp = getattr(erro, "resp", None)  # googleapiclient.errors.HttpError
+        codigo = getattr(resp, "status", None)
+    try:
+        return int(codigo) in CODIGOS_TRANSITORIOS
+    except (TypeError, ValueError):
+        return False
+
+
+def espera_sugerida(erro: BaseException) -> Optional[int]:
+    """Extrai o tempo de espera sugerido pela API em erros de cota (429)."""
+    match = re.search(r'seconds: (\d+)', str(erro))
+    return int(match.group(1)) if match else None
+
+
+# ==============================================================================
+#           LIMITADOR DE TAXA, LATÊNCIA (p95) E DISJUNTOR
+# ==============================================================================
+
+class LimitadorTaxa:
+    """Espaça as requisições ao modelo (RATE_LIMIT_PAUSE). Thread-safe: vale para tentativas, hedges e jobs."""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self._proxima = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self) -> None:
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proxima - agora
+            self._proxima = max(agora, self._proxima) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+class MonitorLatencia:
+    """Janela deslizante das latências de sucesso de um tipo de chamada (ex.: uma persona)."""
+
+    def __init__(self, tamanho_janela: int = 100):
+        self._amostras: Deque[float] = deque(maxlen=tamanho_janela)
+        self._lock = threading.Lock()
+
+    def registrar(self, segundos: float) -> None:
+        with self._lock:
+            self._amostras.append(segundos)
+
+    def p95(self) -> Optional[float]:
+        """Percentil 95 observado, ou None se ainda não houver amostras suficientes."""
+        with self._lock:
+            if len(self._amostras) < AMOSTRAS_MINIMAS_HEDGE:
+                return None
+            ordenadas = sorted(self._amostras)
+        return ordenadas[min(len(ordenadas) - 1, int(0.95 * len(ordenadas)))]
+
+
+class Disjuntor:
+    """Circuit breaker: abre após falhas consecutivas e libera uma chamada de teste após o resfriamento."""
+
+    FECHADO, ABERTO, MEIO_ABERTO = "fechado", "aberto", "meio_aberto"
+
+    def __init__(self, chave: str, limite_falhas: int = 5, tempo_resfriamento: float = 60.0):
+        self.chave = chave
+        self.limite_falhas = limite_falhas
+        self.tempo_resfriamento = tempo_resfriamento
+        self.estado = self.FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._lock = threading.Lock()
+
+    def verificar(self) -> None:
+        """Levanta CircuitoAberto se a chamada não deve ser feita agora."""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return
+            restante = self.tempo_resfriamento - (time.monotonic() - self._aberto_em)
+            if self.estado == self.ABERTO and restante <= 0:
+                self.estado = self.MEIO_ABERTO  # esta chamada é a de teste
+                return
+            raise CircuitoAberto(self.chave, f"Circuito aberto. Nova tentativa liberada em {max(restante, 0):.0f}s.")
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self.estado = self.FECHADO
+            self._falhas = 0
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self._falhas += 1
+            if self.estado == self.MEIO_ABERTO or self._falhas >= self.limite_falhas:
+                self.estado = self.ABERTO
+                self._aberto_em = time.monotonic()
+
+
+# ==============================================================================
+#           EXECUTOR RESILIENTE (PRAZO + HEDGE + RETRY COM JITTER)
+# ==============================================================================
+
+class ExecutorResiliente:
+    """Executa chamadas a um endpoint com prazo, hedge no p95, retry com jitter e disjuntor.
+
+    O disjuntor é único por endpoint; o p95 é medido separadamente por tipo de chamada, pois
+    uma revisão curta e a tradução de um bloco de 4000 caracteres têm latências muito diferentes.
+    """
+
+    def __init__(self, chave: str, prazo: float = 120.0, max_tentativas: int = 3, espera_base: float = 5.0,
+                 espera_maxima: float = 60.0, hedge: bool = True, atraso_minimo_hedge: float = ATRASO_MINIMO_HEDGE):
+        self.chave = chave
+        self.prazo = prazo
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.hedge = hedge
+        self.atraso_minimo_hedge = atraso_minimo_hedge
+        self.disjuntor = Disjuntor(chave)
+        self._latencias: Dict[str, MonitorLatencia] = {}
+        self._latencias_lock = threading.Lock()
+
+    def latencias(self, tipo: str) -> MonitorLatencia:
+        with self._latencias_lock:
+            if tipo not in self._latencias:
+                self._latencias[tipo] = MonitorLatencia()
+            return self._latencias[tipo]
+
+    def executar(self, funcao: Callable[[], T], tipo: str = "padrao",
+                 aguardar_vez: Optional[Callable[[], None]] = None) -> T:
+        """Chama `funcao` até obter sucesso. Levanta sempre uma subclasse de ErroAPI em caso de falha.
+
+        `tipo` separa a janela de latência usada para decidir o hedge (ex.: a persona do prompt).
+        `aguardar_vez` (ex.: LimitadorTaxa.aguardar) roda antes de CADA requisição real, inclusive
+        retries e hedges; o tempo de espera nele não conta no prazo nem na latência registrada.
+        """
+        ultimo_erro: Optional[BaseException] = None
+        for attempt in range(self.max_tentativas):
+            self.disjuntor.verificar()
+            try:
+                resultado = self._executar_com_hedge(funcao, self.latencias(tipo), aguardar_vez)
+            except Exception as e:
+                if not eh_transitorio(e):
+                    self.disjuntor.registrar_sucesso()  # o endpoint respondeu; o problema é a requisição
+                    raise ErroPermanente(self.chave, f"Falha não recuperável: {e}") from e
+                self.disjuntor.registrar_falha()
+                ultimo_erro = e
+                if attempt == self.max_tentativas - 1:
+                    break
+                wait_time = self._calcular_espera(e, attempt)
+                print(f"   [AVISO] Erro transitório em '{self.chave}' ({e}). "
+                      f"Tentativa {attempt + 1} de {self.max_tentativas}. Tentando novamente em {wait_time:.1f}s...")
+                time.sleep(wait_time)
+                continue
+            self.disjuntor.registrar_sucesso()
+            return resultado
+        raise TentativasEsgotadas(
+            self.chave, f"Todas as {self.max_tentativas} tentativas falharam. Último erro: {ultimo_erro}"
+        ) from ultimo_erro
+
+    def _calcular_espera(self, erro: BaseException, attempt: int) -> float:
+        """Backoff exponencial com 'full jitter', respeitando a espera sugerida pela API (limitada)."""
+        sugerida = espera_sugerida(erro)
+        if sugerida is not None:
+            return min(sugerida + random.uniform(0, 1), self.espera_maxima)
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * (2 ** attempt)))
+
+    def _executar_com_hedge(self, funcao: Callable[[], T], latencias: MonitorLatencia,
+                            aguardar_vez: Optional[Callable[[], None]]) -> T:
+        """Uma tentativa com prazo; se passar do p95 observado, dispara uma duplicata e fica com a primeira resposta."""
+        encerrada = threading.Event()
+        inicios: Dict["Future[T]", List[float]] = {}
+
+        def lancar(esperar_vez: bool) -> "Future[T]":
+            inicio_real: List[float] = []
+
+            def requisicao() -> T:
+                if esperar_vez and aguardar_vez is not None:
+                    aguardar_vez()
+                    if encerrada.is_set():  # a tentativa já terminou enquanto o hedge esperava a vez
+                        raise PrazoExcedido(self.chave, "Hedge descartado antes de ser enviado.")
+                inicio_real.append(time.monotonic())
+                return funcao()
+
+            futuro = _iniciar_em_thread(requisicao)
+            inicios[futuro] = inicio_real
+            return futuro
+
+        if aguardar_vez is not None:
+            aguardar_vez()
+        inicio = time.monotonic()
+        p95 = latencias.p95() if self.hedge else None
+        limite_hedge = max(p95, self.atraso_minimo_hedge) if p95 is not None else None
+        pendentes = {lancar(esperar_vez=False)}
+        hedge_enviado = limite_hedge is None
+        erro: Optional[BaseException] = None
+        try:
+            while pendentes:
+                decorrido = time.monotonic() - inicio
+                restante = self.prazo - decorrido
+                if restante <= 0:
+                    raise PrazoExcedido(self.chave, f"Sem resposta em {self.prazo:g}s.")
+                timeout = restante if hedge_enviado else min(restante, max(limite_hedge - decorrido, 0))
+                concluidos, pendentes = wait(pendentes, timeout=timeout, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    if futuro.exception() is None:
+                        latencias.registrar(time.monotonic() - inicios[futuro][0])
+                        return futuro.result()
+                    erro = futuro.exception()
+                if not hedge_enviado and time.monotonic() - inicio >= limite_hedge:
+                    pendentes.add(lancar(esperar_vez=True))
+                    hedge_enviado = True
+            raise erro
+        finally:
+            encerrada.set()
+            for futuro in pendentes:
+                futuro.cancel()
+
+
+_executores: Dict[str, ExecutorResiliente] = {}
+_executores_lock = threading.Lock()
+
+
+def obter_executor(chave: str, **config) -> ExecutorResiliente:
+    """Devolve o executor (e portanto o disjuntor e as latências) compartilhado de um modelo/endpoint."""
+    with _executores_lock:
+        if chave not in _executores:
+            _executores[chave] = ExecutorResiliente(chave, **config)
+        return _executores[chave]
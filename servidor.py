@@ -0,0 +1,786 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import prompts_copy
+import prompts_documento
+from traducao import dividir_em_blocos
+from resiliencia import ErroAPI, ErroPermanente, LimitadorTaxa, obter_executor
+
+# --- Constantes de Configuração ---
+MODEL_NAME = 'models/gemini-2.5-pro'
+# Intervalo mínimo entre chamadas ao modelo, agora compartilhado por TODOS os jobs do servidor.
+RATE_LIMIT_PAUSE = 2
+PRAZO_GEMINI = 120
+PRAZO_PESQUISA = 20
+CAPACIDADE_CACHE = 512
+# Tempo máximo sem eventos no stream antes de enviar um keep-alive.
+INTERVALO_KEEP_ALIVE = 15
+
+IDIOMAS_TRADUCAO = {"en": "Inglês", "es": "Espanhol"}
+ESTADOS_FINAIS = {"concluido", "falhou", "cancelado"}
+# Tempo máximo que um job espera o editor num checkpoint antes de falhar (e liberar a memória pela retenção).
+PRAZO_CHECKPOINT = 6 * 3600
+# Retenção de jobs finalizados (cada um guarda o documento e todos os eventos em memória).
+RETENCAO_JOBS_FINALIZADOS = 3600
+MAX_JOBS_FINALIZADOS = 200
+
+
+# ==============================================================================
+#           BACKENDS (GEMINI/GOOGLE SEARCH REAIS OU STUBS LOCAIS)
+# ==============================================================================
+
+class ModeloGemini:
+    """Backend real: mesmo modelo e mesma camada de resiliência dos scripts interativos."""
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai  # importado só no modo real, para o modo stub rodar sem o SDK
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(MODEL_NAME)
+        self._executor = obter_executor(MODEL_NAME, prazo=PRAZO_GEMINI)
+
+    def gerar(self, prompt_final: str, tipo: str, aguardar_vez: Callable[[], None]) -> str:
+        """O executor chama `aguardar_vez` antes de CADA requisição real (retries e hedges inclusive),
+        fora do prazo e da latência medida: a fila no limitador não dispara hedges nem PrazoExcedido."""
+        return self._executor.executar(
+            lambda: self._model.generate_content(prompt_final, request_options={"timeout": PRAZO_GEMINI}).text.strip(),
+            tipo=tipo, aguardar_vez=aguardar_vez)
+
+
+class PesquisaGoogle:
+    """Backend real da Google Custom Search API."""
+
+    def __init__(self, api_key: str, search_engine_id: str):
+        from googleapiclient.discovery import build
+        self._build = build
+        self._api_key = api_key
+        self._search_engine_id = search_engine_id
+        self._executor = obter_executor("customsearch", prazo=PRAZO_PESQUISA, espera_base=1, hedge=False)
+
+    def pesquisar(self, tema_pesquisa: str, num_results: int) -> Optional[List[Dict[str, str]]]:
+        try:
+            res = self._executor.executar(lambda: self._build("customsearch", "v1", developerKey=self._api_key).cse().list(
+                q=tema_pesquisa, cx=self._search_engine_id, num=num_results, hl='pt-BR').execute())
+        except ErroAPI as e:
+            print(f"[ERRO] Falha na busca via API. Detalhe: {e}")
+            return None
+        if 'items' not in res:
+            return None
+        return [{"titulo": i.get('title'), "url": i.get('link'), "snippet": i.get('snippet')} for i in
+                res.get('items', [])]
+
+
+class ModeloStub:
+    """Modelo determinístico para rodar e testar o servidor localmente, sem chave de API nem rede."""
+
+    def __init__(self, atraso: float = 0.0, taxa_falha: float = 0.0):
+        self.atraso = atraso
+        self.taxa_falha = taxa_falha
+
+    def gerar(self, prompt_final: str, tipo: str, aguardar_vez: Callable[[], None]) -> str:
+        aguardar_vez()
+        time.sleep(self.atraso)
+        if random.random() < self.taxa_falha:
+            raise ErroPermanente("stub", "Falha simulada pelo modelo stub.")
+        assinatura = hashlib.sha256(prompt_final.encode("utf-8")).hexdigest()[:8]
+        primeira_linha = prompt_final.strip().splitlines()[0][:80]
+        return f"Texto simulado [{assinatura}] para um prompt de {len(prompt_final)} caracteres ({primeira_linha})."
+
+
+class PesquisaStub:
+    """Busca determinística: devolve fontes fictícias derivadas do termo pesquisado."""
+
+    def pesquisar(self, tema_pesquisa: str, num_results: int) -> Optional[List[Dict[str, str]]]:
+        slug = re.sub(r'[^a-z0-9]+', '-', tema_pesquisa.lower()).strip('-') or "tema"
+        return [{"titulo": f"Fonte simulada {i} sobre {tema_pesquisa}", "url": f"https://exemplo.com/{slug}/{i}",
+                 "snippet": f"Trecho simulado {i} a respeito de {tema_pesquisa}."} for i in range(1, num_results + 1)]
+
+
+# ==============================================================================
+#           RECURSOS COMPARTILHADOS ENTRE JOBS (CACHE)
+# ==============================================================================
+
+class CacheRespostas:
+    """Cache LRU de respostas do modelo e da busca; só é acessado pela thread do event loop."""
+
+    def __init__(self, capacidade: int = CAPACIDADE_CACHE):
+        self.capacidade = capacidade
+        self.acertos = 0
+        self.falhas = 0
+        self._itens: "OrderedDict[Tuple, Any]" = OrderedDict()
+
+    def obter(self, chave: Tuple) -> Optional[Any]:
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return self._itens[chave]
+        self.falhas += 1
+        return None
+
+    def guardar(self, chave: Tuple, valor: Any) -> None:
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def resumo(self) -> Dict[str, int]:
+        return {"itens": len(self._itens), "acertos": self.acertos, "falhas": self.falhas}
+
+
+# ==============================================================================
+#           JOBS E CHECKPOINTS HITL
+# ==============================================================================
+
+class RequisicaoInvalida(Exception):
+    """Resposta de checkpoint mal formada (HTTP 400)."""
+
+
+class EstadoInvalido(Exception):
+    """O job não está aguardando este checkpoint (HTTP 409)."""
+
+
+class JobNaoEncontrado(Exception):
+    """Id de job inexistente ou já removido pela retenção (HTTP 404)."""
+
+
+class CheckpointExpirado(Exception):
+    """O editor não respondeu ao checkpoint dentro de PRAZO_CHECKPOINT; o job falha."""
+
+
+class Job:
+    """Um documento ou copy em geração. É alterado só pelo event loop; as threads HTTP apenas leem."""
+
+    def __init__(self, tipo: str, parametros: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.tipo = tipo
+        self.parametros = parametros
+        self.estado = "na_fila"
+        self.documento = ""
+        self.checkpoint: Optional[Dict[str, Any]] = None
+        self.erro: Optional[str] = None
+        self.finalizado_em: Optional[float] = None
+        self.eventos: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._resposta: Optional[asyncio.Future] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._com_vaga = False
+
+    def emitir(self, tipo: str, **dados) -> None:
+        with self._cond:
+            self.eventos.append({"seq": len(self.eventos), "tipo": tipo, **dados})
+            self._cond.notify_all()
+
+    def mudar_estado(self, estado: str, **dados) -> None:
+        self.estado = estado
+        if estado in ESTADOS_FINAIS:
+            self.finalizado_em = time.monotonic()
+        self.emitir("estado", estado=estado, **dados)
+
+    def anexar(self, markdown: str) -> None:
+        """Acrescenta um trecho ao documento parcial e o envia a quem acompanha o stream."""
+        self.documento += markdown
+        self.emitir("trecho", markdown=markdown)
+
+    def aguardar_eventos(self, desde: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Bloqueia (na thread HTTP) até haver eventos a partir de `desde` ou o job terminar."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.eventos) > desde or self.estado in ESTADOS_FINAIS, timeout)
+            return self.eventos[desde:], self.estado in ESTADOS_FINAIS
+
+    def resumo(self) -> Dict[str, Any]:
+        return {"id": self.id, "tipo": self.tipo, "estado": self.estado, "checkpoint": self.checkpoint,
+                "erro": self.erro, "parametros": self.parametros, "tamanho_documento": len(self.documento)}
+
+
+def _texto_preenchido(valor: Any) -> bool:
+    """Aceita só strings não vazias: números, listas ou objetos no JSON viram 400, não erros no meio do fluxo."""
+    return isinstance(valor, str) and bool(valor.strip())
+
+
+def _validar_revisao(job: Job, resposta: Dict[str, Any]) -> None:
+    acao = resposta.get("acao")
+    if acao == "continuar":
+        return
+    if acao != "adicionar_secao":
+        raise RequisicaoInvalida("'acao' deve ser 'continuar' ou 'adicionar_secao'.")
+    campo = "pesquisa" if job.tipo == "documento" else "instrucao"
+    for chave in ("titulo", campo):
+        if not _texto_preenchido(resposta.get(chave)):
+            raise RequisicaoInvalida(f"O campo '{chave}' (texto) é obrigatório para adicionar uma seção.")
+
+
+def _validar_traducao(job: Job, resposta: Dict[str, Any]) -> None:
+    idiomas = resposta.get("idiomas")
+    if not isinstance(idiomas, list) or any(not isinstance(i, str) or i not in IDIOMAS_TRADUCAO for i in idiomas):
+        raise RequisicaoInvalida(f"'idiomas' deve ser uma lista com valores em {sorted(IDIOMAS_TRADUCAO)} (vazia = sem tradução).")
+    if len(set(idiomas)) != len(idiomas):
+        raise RequisicaoInvalida("'idiomas' não pode ter valores repetidos (cada tradução é cobrada).")
+
+
+def _validar_falha(job: Job, resposta: Dict[str, Any]) -> None:
+    if resposta.get("acao") not in ("tentar_novamente", "pular"):
+        raise RequisicaoInvalida("'acao' deve ser 'tentar_novamente' ou 'pular'.")
+
+
+VALIDADORES_CHECKPOINT: Dict[str, Callable[[Job, Dict[str, Any]], None]] = {
+    "revisao": _validar_revisao,
+    "traducao": _validar_traducao,
+    "falha": _validar_falha,
+}
+
+
+# ==============================================================================
+#           SERVIÇO: POOL DE WORKERS ASSÍNCRONOS
+# ==============================================================================
+
+class ServicoCopiloto:
+    """Executa jobs num event loop próprio, com até `workers` jobs gerando ao mesmo tempo.
+
+    Um job parado num checkpoint HITL devolve sua vaga ao pool até o editor responder.
+    """
+
+    def __init__(self, modelo, pesquisa, workers: int = 4, intervalo: float = RATE_LIMIT_PAUSE,
+                 prazo_checkpoint: float = PRAZO_CHECKPOINT):
+        self.modelo = modelo
+        self.pesquisa = pesquisa
+        self.workers = workers
+        self.prazo_checkpoint = prazo_checkpoint
+        self.cache = CacheRespostas()
+        self._jobs: Dict[str, Job] = {}
+        self._jobs_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="copiloto-loop", daemon=True)
+        self._thread.start()
+        self._limitador = LimitadorTaxa(intervalo)
+        self._vagas = self._no_loop(self._criar_vagas())
+
+    async def _criar_vagas(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.workers)
+
+    def _no_loop(self, coro, timeout: Optional[float] = None):
+        """Executa uma corrotina no event loop a partir de uma thread HTTP e devolve o resultado."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def encerrar(self) -> None:
+        """Cancela os jobs em andamento (inclusive os parados em checkpoints) e para o event loop."""
+        self._no_loop(self._cancelar_jobs(), timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _cancelar_jobs(self) -> None:
+        tarefas = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    # --- API usada pelas threads HTTP ---
+
+    def criar_job(self, tipo: str, parametros: Dict[str, Any]) -> Job:
+        if tipo not in FLUXOS:
+            raise RequisicaoInvalida(f"Tipo de job desconhecido: '{tipo}'.")
+        FLUXOS[tipo][0](parametros)
+        job = Job(tipo, parametros)
+        with self._jobs_lock:
+            self._remover_jobs_expirados()
+            self._jobs[job.id] = job
+        job.emitir("estado", estado=job.estado)
+        self._loop.call_soon_threadsafe(self._iniciar, job)
+        return job
+
+    def obter_job(self, job_id: str) -> Job:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNaoEncontrado(f"Job '{job_id}' não encontrado.")
+        return job
+
+    def listar_jobs(self) -> List[Job]:
+        with self._jobs_lock:
+            self._remover_jobs_expirados()
+            return list(self._jobs.values())
+
+    def _remover_jobs_expirados(self) -> None:
+        """Descarta jobs finalizados há mais de RETENCAO_JOBS_FINALIZADOS ou além de MAX_JOBS_FINALIZADOS."""
+        agora = time.monotonic()
+        finalizados = sorted((j for j in self._jobs.values() if j.finalizado_em is not None),
+                             key=lambda j: j.finalizado_em)
+        excedentes = len(finalizados) - MAX_JOBS_FINALIZADOS
+        for i, job in enumerate(finalizados):
+            if i < excedentes or agora - job.finalizado_em > RETENCAO_JOBS_FINALIZADOS:
+                del self._jobs[job.id]
+
+    def responder(self, job_id: str, tipo_checkpoint: str, resposta: Dict[str, Any]) -> Job:
+        job = self.obter_job(job_id)
+        self._no_loop(self._responder(job, tipo_checkpoint, resposta))
+        return job
+
+    def cancelar(self, job_id: str) -> Job:
+        """Cancela um job em andamento; um job já finalizado é removido da memória na hora."""
+        job = self.obter_job(job_id)
+        if job.estado in ESTADOS_FINAIS:
+            with self._jobs_lock:
+                self._jobs.pop(job.id, None)
+            return job
+        self._no_loop(self._cancelar(job))
+        return job
+
+    # --- Execução no event loop ---
+
+    def _iniciar(self, job: Job) -> None:
+        job._tarefa = self._loop.create_task(self._executar(job))
+
+    async def _cancelar(self, job: Job) -> None:
+        if job._tarefa is None or job._tarefa.done():
+            raise EstadoInvalido(f"O job já terminou (estado: {job.estado}).")
+        job._tarefa.cancel()
+        await asyncio.gather(job._tarefa, return_exceptions=True)
+
+    async def _responder(self, job: Job, tipo_checkpoint: str, resposta: Dict[str, Any]) -> None:
+        if job.checkpoint is None or job.checkpoint["tipo"] != tipo_checkpoint or job._resposta.done():
+            pendente = job.checkpoint["tipo"] if job.checkpoint else None
+            raise EstadoInvalido(f"O job não está aguardando o checkpoint '{tipo_checkpoint}' (pendente: {pendente}).")
+        VALIDADORES_CHECKPOINT[tipo_checkpoint](job, resposta)
+        job._resposta.set_result(resposta)
+        # O job só volta a "executando" quando recuperar uma vaga de worker; até lá, rejeita respostas repetidas.
+        job.checkpoint = None
+        job.mudar_estado("resposta_recebida")
+
+    async def _executar(self, job: Job) -> None:
+        try:
+            await self._vagas.acquire()
+            job._com_vaga = True
+            job.mudar_estado("executando")
+            await FLUXOS[job.tipo][1](self, job)
+            job.mudar_estado("concluido")
+        except asyncio.CancelledError:
+            job.mudar_estado("cancelado")
+            raise
+        except Exception as e:
+            job.erro = f"{type(e).__name__}: {e}"
+            job.mudar_estado("falhou", erro=job.erro)
+        finally:
+            # Um job cancelado ou expirado num checkpoint não tem vaga a devolver.
+            if job._com_vaga:
+                job._com_vaga = False
+                self._vagas.release()
+
+    async def checkpoint(self, job: Job, tipo: str, **dados) -> Dict[str, Any]:
+        """Pausa o job até o editor responder pela API, liberando a vaga de worker enquanto espera."""
+        job.checkpoint = {"tipo": tipo, **dados}
+        job._resposta = self._loop.create_future()
+        job.mudar_estado("aguardando_editor", checkpoint=job.checkpoint)
+        job._com_vaga = False
+        self._vagas.release()
+        try:
+            resposta = await asyncio.wait_for(job._resposta, self.prazo_checkpoint)
+        except asyncio.TimeoutError:
+            raise CheckpointExpirado(
+                f"Sem resposta ao checkpoint '{tipo}' em {self.prazo_checkpoint:g}s.") from None
+        finally:
+            job.checkpoint = None
+        await self._vagas.acquire()
+        job._com_vaga = True
+        job._resposta = None
+        job.mudar_estado("executando")
+        return resposta
+
+    async def gerar(self, prompt: str, persona: str, criar_prompt_mestre: Callable[[str, str], str]) -> str:
+        prompt_final = criar_prompt_mestre(prompt, persona)
+        chave = ("modelo", hashlib.sha256(prompt_final.encode("utf-8")).hexdigest())
+        texto = self.cache.obter(chave)
+        if texto is None:
+            texto = await asyncio.to_thread(self.modelo.gerar, prompt_final, persona, self._limitador.aguardar)
+            self.cache.guardar(chave, texto)
+        return texto
+
+    async def gerar_com_intervencao(self, job: Job, prompt: str, persona: str,
+                                    criar_prompt_mestre: Callable[[str, str], str]) -> Optional[str]:
+        """Como nos scripts: em caso de falha o editor decide se tenta de novo ou pula (None)."""
+        while True:
+            try:
+                return await self.gerar(prompt, persona, criar_prompt_mestre)
+            except ErroAPI as e:
+                resposta = await self.checkpoint(job, "falha", erro=str(e), tipo_erro=type(e).__name__)
+                if resposta["acao"] == "pular":
+                    return None
+
+    async def pesquisar(self, tema_pesquisa: str, num_results: int) -> Optional[List[Dict[str, str]]]:
+        chave = ("pesquisa", tema_pesquisa, num_results)
+        fontes = self.cache.obter(chave)
+        if fontes is None:
+            fontes = await asyncio.to_thread(self.pesquisa.pesquisar, tema_pesquisa, num_results)
+            if fontes:
+                self.cache.guardar(chave, fontes)
+        return fontes
+
+    async def traduzir(self, job: Job, texto: str, lang: str,
+                       criar_prompt_mestre: Callable[[str, str], str]) -> Optional[str]:
+        texto_traduzido = ""
+        for bloco in dividir_em_blocos(texto):
+            traducao = await self.gerar_com_intervencao(job, bloco, f"tradutor_{lang}", criar_prompt_mestre)
+            if traducao is None:
+                return None
+            texto_traduzido += traducao + "\n"
+        return texto_traduzido
+
+
+# ==============================================================================
+#           FLUXOS (MESMA ORQUESTRAÇÃO DE main.py E CopyWriting.py)
+# ==============================================================================
+
+def _validar_parametros_documento(parametros: Dict[str, Any]) -> None:
+    if not _texto_preenchido(parametros.get("tema")):
+        raise RequisicaoInvalida("O campo 'tema' (texto) é obrigatório.")
+
+
+async def fluxo_documento(servico: ServicoCopiloto, job: Job) -> None:
+    criar_prompt = prompts_documento.criar_prompt_mestre
+    tema_principal = job.parametros["tema"]
+    job.anexar(f"# {tema_principal}\n\n")
+    contexto_cumulativo = ""
+    collected_references = []
+    seen_urls = set()
+
+    for num_parte_atual, parte in enumerate(prompts_documento.montar_estrutura_documento(tema_principal), 1):
+        conteudo_parte_atual = f"# {num_parte_atual}. {parte['titulo_parte']}\n\n"
+        job.anexar(conteudo_parte_atual)
+
+        num_secao_atual = 0
+        for secao in parte['secoes']:
+            fontes = await servico.pesquisar(secao["pesquisa"], 6)
+            for fonte in fontes or []:
+                if fonte['url'] and fonte['url'] not in seen_urls:
+                    collected_references.append(fonte)
+                    seen_urls.add(fonte['url'])
+
+            fontes_fmt = prompts_documento.formatar_fontes_para_prompt(fontes) if fontes else "Nenhuma fonte externa encontrada."
+            prompt = secao["prompt"](fontes_fmt, contexto_cumulativo[-8000:])
+            texto_gerado = await servico.gerar_com_intervencao(job, prompt, "analista", criar_prompt)
+            if texto_gerado is None:
+                continue
+            num_secao_atual += 1
+            bloco = f"## {num_parte_atual}.{num_secao_atual}. {secao['titulo']}\n\n{texto_gerado}\n\n"
+            job.anexar(bloco)
+            conteudo_parte_atual += bloco
+            contexto_cumulativo += texto_gerado + "\n\n"
+
+        sugestoes_ia = await servico.gerar_com_intervencao(
+            job, prompts_documento.montar_prompt_revisao(conteudo_parte_atual), "editor", criar_prompt)
+        while True:
+            resposta = await servico.checkpoint(job, "revisao", parte=num_parte_atual, sugestoes=sugestoes_ia)
+            if resposta["acao"] == "continuar":
+                break
+            fontes = await servico.pesquisar(resposta["pesquisa"], 6)
+            fontes_fmt = prompts_documento.formatar_fontes_para_prompt(fontes) if fontes else "Nenhuma fonte externa encontrada."
+            prompt = prompts_documento.montar_prompt_ad_hoc(resposta["titulo"], fontes_fmt, contexto_cumulativo)
+            texto_gerado = await servico.gerar_com_intervencao(job, prompt, "analista", criar_prompt)
+            if texto_gerado is None:
+                continue
+            num_secao_atual += 1
+            novo_conteudo = f"## {num_parte_atual}.{num_secao_atual}. {resposta['titulo']}\n\n{texto_gerado}\n\n"
+            job.anexar(novo_conteudo)
+            contexto_cumulativo += novo_conteudo
+
+    if collected_references:
+        fontes_brutas = prompts_documento.montar_fontes_brutas(collected_references)
+        secao_referencias = await servico.gerar_com_intervencao(job, fontes_brutas, "referencias", criar_prompt)
+        job.anexar(f"# Referências\n\n{secao_referencias or fontes_brutas}\n\n")
+    else:
+        job.anexar("# Referências\n\nNenhuma fonte externa foi utilizada na geração deste documento.\n\n")
+
+    documento_pt = job.documento
+    titulos = {"en": "# English Translation", "es": "# Traducción al Español"}
+    resposta = await servico.checkpoint(job, "traducao", idiomas_disponiveis=sorted(IDIOMAS_TRADUCAO))
+    for lang in resposta["idiomas"]:
+        traducao = await servico.traduzir(job, documento_pt, lang, criar_prompt)
+        if traducao is not None:
+            job.anexar(f"\n\n---\n\n{titulos[lang]}\n\n{traducao}")
+
+
+def _validar_parametros_copy(parametros: Dict[str, Any]) -> None:
+    for campo in prompts_copy.CAMPOS_BRIEFING + ["objetivo_principal"]:
+        if not _texto_preenchido(parametros.get(campo)):
+            raise RequisicaoInvalida(f"O campo '{campo}' (texto) é obrigatório.")
+
+
+async def fluxo_copy(servico: ServicoCopiloto, job: Job) -> None:
+    criar_prompt = prompts_copy.criar_prompt_mestre
+    info_cliente = {campo: job.parametros[campo] for campo in prompts_copy.CAMPOS_BRIEFING}
+    objetivo_principal = job.parametros["objetivo_principal"]
+    job.anexar(f"# Website Copy: {info_cliente['nome_marca']}\n\n")
+    contexto_cumulativo = ""
+
+    estrutura_website = prompts_copy.montar_estrutura_website(info_cliente, objetivo_principal)
+    for num_parte_atual, pagina in enumerate(estrutura_website, 1):
+        conteudo_pagina_atual = f"# {num_parte_atual}. {pagina['titulo_pagina']}\n\n"
+        job.anexar(conteudo_pagina_atual)
+
+        num_secao_atual = 0
+        for secao in pagina['secoes']:
+            fontes = await servico.pesquisar(secao["pesquisa"], 4)
+            fontes_fmt = prompts_copy.formatar_fontes_para_prompt(
+                fontes) if fontes else "Nenhuma fonte externa encontrada para referência."
+            prompt = prompts_copy.montar_prompt_secao(secao, fontes_fmt, contexto_cumulativo, info_cliente,
+                                                      objetivo_principal)
+            texto_gerado = await servico.gerar_com_intervencao(job, prompt, "copywriter", criar_prompt)
+            if texto_gerado is None:
+                continue
+            num_secao_atual += 1
+            bloco = f"## {num_parte_atual}.{num_secao_atual}. {secao['titulo']}\n\n{texto_gerado}\n\n"
+            job.anexar(bloco)
+            conteudo_pagina_atual += bloco
+            contexto_cumulativo += texto_gerado + "\n\n"
+
+        sugestoes_ia = await servico.gerar_com_intervencao(
+            job, prompts_copy.montar_prompt_revisao(conteudo_pagina_atual, info_cliente), "editor_copy", criar_prompt)
+        while True:
+            resposta = await servico.checkpoint(job, "revisao", parte=num_parte_atual, sugestoes=sugestoes_ia)
+            if resposta["acao"] == "continuar":
+                break
+            fontes = await servico.pesquisar(prompts_copy.montar_termo_pesquisa_ad_hoc(info_cliente), 2)
+            fontes_fmt = prompts_copy.formatar_fontes_para_prompt(fontes) if fontes else "Nenhuma análise de concorrente encontrada."
+            prompt = prompts_copy.montar_prompt_ad_hoc(resposta["instrucao"], fontes_fmt, contexto_cumulativo, info_cliente)
+            texto_gerado = await servico.gerar_com_intervencao(job, prompt, "copywriter", criar_prompt)
+            if texto_gerado is None:
+                continue
+            num_secao_atual += 1
+            novo_conteudo = f"## {num_parte_atual}.{num_secao_atual}. {resposta['titulo']}\n\n{texto_gerado}\n\n"
+            job.anexar(novo_conteudo)
+            contexto_cumulativo += novo_conteudo
+
+    website_copy_pt = job.documento
+    titulos = {"en": "# English Website Copy", "es": "# Copy para Sitio Web en Español"}
+    resposta = await servico.checkpoint(job, "traducao", idiomas_disponiveis=sorted(IDIOMAS_TRADUCAO))
+    for lang in resposta["idiomas"]:
+        traducao = await servico.traduzir(job, website_copy_pt, lang, criar_prompt)
+        if traducao is not None:
+            job.anexar(f"\n\n---\n\n{titulos[lang]}\n\n{traducao}")
+
+
+# Tipo de job -> (validação dos parâmetros, fluxo).
+FLUXOS = {
+    "documento": (_validar_parametros_documento, fluxo_documento),
+    "copy": (_validar_parametros_copy, fluxo_copy),
+}
+
+
+# ==============================================================================
+#           CAMADA HTTP
+# ==============================================================================
+
+ROTA_JOB = re.compile(r'^/jobs/([0-9a-f]+)(?:/([a-z_]+))?$')
+
+
+def _ler_inteiro(valor: str, nome: str) -> int:
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise RequisicaoInvalida(f"'{nome}' deve ser um número inteiro.")
+    if numero < 0:
+        raise RequisicaoInvalida(f"'{nome}' não pode ser negativo.")
+    return numero
+
+
+class ManipuladorHTTP(BaseHTTPRequestHandler):
+    """Rotas:
+    POST /jobs/documento | /jobs/copy          -> cria o job (corpo JSON com os parâmetros)
+    GET  /jobs | /jobs/<id>                    -> estado e checkpoint pendente
+    GET  /jobs/<id>/documento                  -> documento parcial/final em Markdown
+    GET  /jobs/<id>/eventos                    -> stream (Server-Sent Events) do documento parcial
+    POST /jobs/<id>/revisao | traducao | falha -> resposta do editor ao checkpoint HITL
+    DELETE /jobs/<id>                          -> cancela o job (ou descarta um job já finalizado)
+    GET  /saude                                -> estado do pool e do cache
+    """
+
+    server_version = "CopilotoConteudo/1.0"
+
+    @property
+    def servico(self) -> ServicoCopiloto:
+        return self.server.servico
+
+    def log_message(self, format: str, *args) -> None:
+        print(f"[HTTP] {self.address_string()} {format % args}")
+
+    def _responder_json(self, status: int, corpo: Any) -> None:
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self) -> Dict[str, Any]:
+        tamanho = _ler_inteiro(self.headers.get("Content-Length") or "0", "Content-Length")
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        except json.JSONDecodeError as e:
+            raise RequisicaoInvalida(f"JSON inválido: {e}")
+        if not isinstance(corpo, dict):
+            raise RequisicaoInvalida("O corpo da requisição deve ser um objeto JSON.")
+        return corpo
+
+    def _tratar(self, acao: Callable[[], None]) -> None:
+        try:
+            acao()
+        except RequisicaoInvalida as e:
+            self._responder_json(400, {"erro": str(e)})
+        except JobNaoEncontrado as e:
+            self._responder_json(404, {"erro": str(e)})
+        except EstadoInvalido as e:
+            self._responder_json(409, {"erro": str(e)})
+        except Exception as e:
+            print(f"[ERRO] Falha inesperada em {self.command} {self.path}:\n{traceback.format_exc()}")
+            self._responder_json(500, {"erro": f"Erro interno: {type(e).__name__}."})
+
+    def do_GET(self) -> None:
+        self._tratar(self._get)
+
+    def do_POST(self) -> None:
+        self._tratar(self._post)
+
+    def do_DELETE(self) -> None:
+        self._tratar(self._delete)
+
+    def _get(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/saude":
+            self._responder_json(200, {"status": "ok", "workers": self.servico.workers,
+                                       "jobs": len(self.servico.listar_jobs()), "cache": self.servico.cache.resumo()})
+            return
+        if url.path == "/jobs":
+            self._responder_json(200, [job.resumo() for job in self.servico.listar_jobs()])
+            return
+        rota = ROTA_JOB.match(url.path)
+        if not rota:
+            self._responder_json(404, {"erro": "Rota não encontrada."})
+            return
+        job = self.servico.obter_job(rota.group(1))
+        if rota.group(2) is None:
+            self._responder_json(200, {**job.resumo(), "documento": job.documento})
+        elif rota.group(2) == "documento":
+            dados = job.documento.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/markdown; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        elif rota.group(2) == "eventos":
+            ultimo_id = self.headers.get("Last-Event-ID")
+            if ultimo_id:
+                desde = _ler_inteiro(ultimo_id, "Last-Event-ID") + 1
+            else:
+                desde = _ler_inteiro(parse_qs(url.query).get("desde", ["0"])[0], "desde")
+            self._transmitir_eventos(job, desde)
+        else:
+            self._responder_json(404, {"erro": "Rota não encontrada."})
+
+    def _post(self) -> None:
+        path = urlparse(self.path).path
+        if path in ("/jobs/documento", "/jobs/copy"):
+            job = self.servico.criar_job(path.rsplit("/", 1)[1], self._ler_json())
+            self._responder_json(202, job.resumo())
+            return
+        rota = ROTA_JOB.match(path)
+        if not rota or rota.group(2) not in VALIDADORES_CHECKPOINT:
+            self._responder_json(404, {"erro": "Rota não encontrada."})
+            return
+        job = self.servico.responder(rota.group(1), rota.group(2), self._ler_json())
+        self._responder_json(200, job.resumo())
+
+    def _delete(self) -> None:
+        rota = ROTA_JOB.match(urlparse(self.path).path)
+        if not rota or rota.group(2) is not None:
+            self._responder_json(404, {"erro": "Rota não encontrada."})
+            return
+        job = self.servico.cancelar(rota.group(1))
+        self._responder_json(200, job.resumo())
+
+    def _transmitir_eventos(self, job: Job, desde: int) -> None:
+        """Envia os eventos do job como Server-Sent Events até ele terminar (ou o cliente desconectar)."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while True:
+                eventos, terminado = job.aguardar_eventos(desde, INTERVALO_KEEP_ALIVE)
+                for evento in eventos:
+                    dados = json.dumps(evento, ensure_ascii=False)
+                    self.wfile.write(f"id: {evento['seq']}\nevent: {evento['tipo']}\ndata: {dados}\n\n".encode("utf-8"))
+                    desde = evento["seq"] + 1
+                if not eventos:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+                if terminado and desde >= len(job.eventos):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+def criar_servidor_http(servico: ServicoCopiloto, host: str, porta: int) -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorHTTP)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    return servidor
+
+
+# ==============================================================================
+#           ENTRADA DO SERVIDOR
+# ==============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP multiusuário do Co-piloto de Conteúdo.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="Jobs gerando conteúdo ao mesmo tempo.")
+    parser.add_argument("--intervalo", type=float, default=None,
+                        help=f"Pausa mínima entre chamadas ao modelo (padrão: {RATE_LIMIT_PAUSE}s; 0 no modo stub).")
+    parser.add_argument("--stub", action="store_true", help="Usa modelo e busca simulados (sem chave de API nem rede).")
+    parser.add_argument("--atraso-stub", type=float, default=0.0, help="Latência simulada do modelo stub, em segundos.")
+    parser.add_argument("--falha-stub", type=float, default=0.0, help="Probabilidade (0-1) de falha do modelo stub.")
+    parser.add_argument("--prazo-checkpoint", type=float, default=PRAZO_CHECKPOINT,
+                        help="Segundos que um job espera a resposta do editor antes de falhar.")
+    args = parser.parse_args()
+
+    if args.stub:
+        modelo, pesquisa = ModeloStub(args.atraso_stub, args.falha_stub), PesquisaStub()
+        intervalo = 0.0 if args.intervalo is None else args.intervalo
+    else:
+        import dotenv
+        dotenv.load_dotenv()
+        api_key = os.getenv("GEMINI_API_KEY")
+        search_engine_id = os.getenv("SEARCH_ENGINE_ID")
+        if not api_key or not search_engine_id:
+            print("Erro: Chave de API ou ID do Mecanismo de Pesquisa não encontrada no arquivo .env")
+            exit()
+        modelo, pesquisa = ModeloGemini(api_key), PesquisaGoogle(api_key, search_engine_id)
+        intervalo = RATE_LIMIT_PAUSE if args.intervalo is None else args.intervalo
+
+    servico = ServicoCopiloto(modelo, pesquisa, workers=args.workers, intervalo=intervalo,
+                              prazo_checkpoint=args.prazo_checkpoint)
+    servidor = criar_servidor_http(servico, args.host, args.porta)
+    modo = "STUB" if args.stub else "GEMINI"
+    print(f"--- 🚀 Co-piloto de Conteúdo: servidor em http://{args.host}:{args.porta} ({modo}, {args.workers} workers) 🚀 ---")
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+        servico.encerrar()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nEncerrado pelo usuário.")
@@ -0,0 +1,154 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from resiliencia import (CircuitoAberto, Disjuntor, ErroPermanente, ExecutorResiliente, LimitadorTaxa,
+                         PrazoExcedido, TentativasEsgotadas, eh_transitorio, espera_sugerida)
+
+
+class ErroHTTP(Exception):
+    """Imita google.api_core (atributo `code`)."""
+
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class ErroHttpClient(Exception):
+    """Imita googleapiclient.errors.HttpError (atributo `resp.status`)."""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = SimpleNamespace(status=status)
+
+
+class Contador:
+    """Função chamável que conta as chamadas e delega a um comportamento por chamada."""
+
+    def __init__(self, comportamento):
+        self.chamadas = 0
+        self.comportamento = comportamento
+
+    def __call__(self):
+        self.chamadas += 1
+        return self.comportamento(self.chamadas)
+
+
+def novo_executor(**config):
+    padrao = dict(prazo=2.0, espera_base=0.001, espera_maxima=0.01, atraso_minimo_hedge=0.05)
+    padrao.update(config)
+    return ExecutorResiliente("teste", **padrao)
+
+
+class TestClassificacao(unittest.TestCase):
+
+    def test_transitorio_por_code(self):
+        self.assertTrue(eh_transitorio(ErroHTTP(503)))
+        self.assertTrue(eh_transitorio(ErroHTTP(429)))
+        self.assertFalse(eh_transitorio(ErroHTTP(400)))
+
+    def test_transitorio_por_resp_status(self):
+        self.assertTrue(eh_transitorio(ErroHttpClient(500)))
+        self.assertFalse(eh_transitorio(ErroHttpClient(404)))
+
+    def test_transitorio_por_tipo(self):
+        self.assertTrue(eh_transitorio(TimeoutError()))
+        self.assertTrue(eh_transitorio(ConnectionError()))
+        self.assertFalse(eh_transitorio(ValueError("conteúdo bloqueado")))
+
+    def test_espera_sugerida(self):
+        self.assertEqual(espera_sugerida(Exception("retry_delay { seconds: 17 }")), 17)
+        self.assertIsNone(espera_sugerida(Exception("sem dica")))
+
+    def test_erro_permanente_nao_e_repetido(self):
+        funcao = Contador(lambda n: (_ for _ in ()).throw(ErroHTTP(400)))
+        with self.assertRaises(ErroPermanente):
+            novo_executor().executar(funcao)
+        self.assertEqual(funcao.chamadas, 1)
+
+    def test_erro_transitorio_e_repetido(self):
+        funcao = Contador(lambda n: "ok" if n == 3 else (_ for _ in ()).throw(ErroHTTP(503)))
+        self.assertEqual(novo_executor(max_tentativas=3).executar(funcao), "ok")
+        self.assertEqual(funcao.chamadas, 3)
+
+
+class TestPrazoEHedge(unittest.TestCase):
+
+    def test_prazo_excedido(self):
+        funcao = Contador(lambda n: time.sleep(0.5))
+        with self.assertRaises(TentativasEsgotadas) as contexto:
+            novo_executor(prazo=0.1, max_tentativas=1).executar(funcao)
+        self.assertIsInstance(contexto.exception.__cause__, PrazoExcedido)
+
+    def test_hedge_apos_p95_e_duplicata_mais_rapida_vence(self):
+        executor = novo_executor()
+        for _ in range(5):
+            executor.executar(lambda: time.sleep(0.005), tipo="editor")
+        funcao = Contador(lambda n: time.sleep(1.0) or n if n == 1 else n)
+        inicio = time.monotonic()
+        self.assertEqual(executor.executar(funcao, tipo="editor"), 2)
+        self.assertLess(time.monotonic() - inicio, 0.5)
+        self.assertEqual(funcao.chamadas, 2)
+
+    def test_sem_hedge_para_tipo_sem_amostras(self):
+        executor = novo_executor()
+        for _ in range(5):
+            executor.executar(lambda: time.sleep(0.005), tipo="editor")
+        funcao = Contador(lambda n: time.sleep(0.2) or n)
+        self.assertEqual(executor.executar(funcao, tipo="tradutor_en"), 1)
+        self.assertEqual(funcao.chamadas, 1)
+
+    def test_hedge_desligado(self):
+        executor = novo_executor(hedge=False)
+        for _ in range(5):
+            executor.executar(lambda: time.sleep(0.005))
+        funcao = Contador(lambda n: time.sleep(0.2) or n)
+        self.assertEqual(executor.executar(funcao), 1)
+        self.assertEqual(funcao.chamadas, 1)
+
+    def test_espera_do_limitador_fora_do_prazo(self):
+        limitador = LimitadorTaxa(0.3)
+        executor = novo_executor(prazo=0.2)
+        for _ in range(3):
+            executor.executar(lambda: time.sleep(0.01), aguardar_vez=limitador.aguardar)
+
+
+class TestDisjuntor(unittest.TestCase):
+
+    def test_ciclo_fechado_aberto_meio_aberto_fechado(self):
+        disjuntor = Disjuntor("teste", limite_falhas=2, tempo_resfriamento=0.1)
+        disjuntor.verificar()
+        disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, Disjuntor.FECHADO)
+        disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, Disjuntor.ABERTO)
+        with self.assertRaises(CircuitoAberto):
+            disjuntor.verificar()
+        time.sleep(0.15)
+        disjuntor.verificar()
+        self.assertEqual(disjuntor.estado, Disjuntor.MEIO_ABERTO)
+        with self.assertRaises(CircuitoAberto):
+            disjuntor.verificar()  # só uma chamada de teste por vez
+        disjuntor.registrar_sucesso()
+        self.assertEqual(disjuntor.estado, Disjuntor.FECHADO)
+
+    def test_falha_no_meio_aberto_reabre(self):
+        disjuntor = Disjuntor("teste", limite_falhas=1, tempo_resfriamento=0.05)
+        disjuntor.registrar_falha()
+        time.sleep(0.1)
+        disjuntor.verificar()
+        disjuntor.registrar_falha()
+        self.assertEqual(disjuntor.estado, Disjuntor.ABERTO)
+
+    def test_circuito_aberto_nao_chama_funcao(self):
+        executor = novo_executor()
+        for _ in range(executor.disjuntor.limite_falhas):
+            executor.disjuntor.registrar_falha()
+        funcao = Contador(lambda n: "ok")
+        with self.assertRaises(CircuitoAberto):
+            executor.executar(funcao)
+        self.assertEqual(funcao.chamadas, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
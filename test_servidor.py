@@ -0,0 +1,187 @@
+import http.client
+import json
+import threading
+import time
+import unittest
+
+from prompts_copy import CAMPOS_BRIEFING
+from resiliencia import ErroPermanente
+from servidor import ModeloStub, PesquisaStub, ServicoCopiloto, criar_servidor_http
+
+
+class ModeloFalhaNaPrimeira(ModeloStub):
+    """Stub que falha só na primeira chamada, para exercitar o checkpoint de falha."""
+
+    def __init__(self):
+        super().__init__()
+        self.chamadas = 0
+
+    def gerar(self, prompt_final, tipo, aguardar_vez):
+        self.chamadas += 1
+        if self.chamadas == 1:
+            raise ErroPermanente("stub", "Falha simulada.")
+        return super().gerar(prompt_final, tipo, aguardar_vez)
+
+
+class TestServidor(unittest.TestCase):
+
+    def setUp(self):
+        self.iniciar(ModeloStub())
+
+    def iniciar(self, modelo, **config):
+        self.servico = ServicoCopiloto(modelo, PesquisaStub(), workers=2, intervalo=0, **config)
+        self.servidor = criar_servidor_http(self.servico, "127.0.0.1", 0)
+        self.servidor.RequestHandlerClass.log_message = lambda *args: None
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.porta = self.servidor.server_address[1]
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        self.servico.encerrar()
+
+    def requisitar(self, metodo, caminho, corpo=None, headers=None):
+        conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=10)
+        dados = json.dumps(corpo).encode("utf-8") if corpo is not None else None
+        conexao.request(metodo, caminho, body=dados, headers=headers or {})
+        resposta = conexao.getresponse()
+        texto = resposta.read().decode("utf-8")
+        conexao.close()
+        if resposta.getheader("Content-Type", "").startswith("application/json"):
+            return resposta.status, json.loads(texto)
+        return resposta.status, texto
+
+    def aguardar_checkpoint(self, job_id, tipo):
+        for _ in range(200):
+            status, job = self.requisitar("GET", f"/jobs/{job_id}")
+            if job["estado"] == "aguardando_editor" and job["checkpoint"]["tipo"] == tipo:
+                return job
+            time.sleep(0.02)
+        self.fail(f"Checkpoint '{tipo}' não alcançado (estado: {job['estado']}).")
+
+    def aguardar_estado(self, job_id, estado):
+        for _ in range(200):
+            status, job = self.requisitar("GET", f"/jobs/{job_id}")
+            if job["estado"] == estado:
+                return job
+            time.sleep(0.02)
+        self.fail(f"Estado '{estado}' não alcançado (estado: {job['estado']}).")
+
+    def criar_documento(self, tema="Logística"):
+        status, job = self.requisitar("POST", "/jobs/documento", {"tema": tema})
+        self.assertEqual(status, 202)
+        return job["id"]
+
+    def test_fluxo_documento_com_revisao_e_traducao(self):
+        job_id = self.criar_documento()
+        eventos = []
+
+        def acompanhar():
+            conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=10)
+            conexao.request("GET", f"/jobs/{job_id}/eventos")
+            for linha in conexao.getresponse():
+                if linha.startswith(b"event:"):
+                    eventos.append(linha.decode().split()[1])
+
+        leitor = threading.Thread(target=acompanhar)
+        leitor.start()
+
+        job = self.aguardar_checkpoint(job_id, "revisao")
+        self.assertEqual(job["checkpoint"]["parte"], 1)
+        self.assertIn("Texto simulado", job["checkpoint"]["sugestoes"])
+        status, _ = self.requisitar("POST", f"/jobs/{job_id}/revisao",
+                                    {"acao": "adicionar_secao", "titulo": "Seção Extra", "pesquisa": "extra"})
+        self.assertEqual(status, 200)
+        for _ in range(5):
+            self.aguardar_checkpoint(job_id, "revisao")
+            self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "continuar"})
+        job = self.aguardar_checkpoint(job_id, "traducao")
+        self.assertEqual(job["checkpoint"]["idiomas_disponiveis"], ["en", "es"])
+        for idiomas in (["es", "es"], [["en"]], "en"):
+            self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/traducao", {"idiomas": idiomas})[0], 400)
+        self.requisitar("POST", f"/jobs/{job_id}/traducao", {"idiomas": ["en"]})
+        self.aguardar_estado(job_id, "concluido")
+
+        status, documento = self.requisitar("GET", f"/jobs/{job_id}/documento")
+        self.assertEqual(status, 200)
+        self.assertIn("## 1.3. Seção Extra", documento)
+        self.assertIn("# Referências", documento)
+        self.assertIn("# English Translation", documento)
+        self.assertNotIn("# Traducción al Español", documento)
+
+        leitor.join(10)
+        self.assertFalse(leitor.is_alive())
+        self.assertIn("trecho", eventos)
+        self.assertEqual(eventos[-1], "estado")
+
+    def test_checkpoint_de_falha(self):
+        self.tearDown()
+        self.iniciar(ModeloFalhaNaPrimeira())
+        job_id = self.criar_documento()
+        job = self.aguardar_checkpoint(job_id, "falha")
+        self.assertEqual(job["checkpoint"]["tipo_erro"], "ErroPermanente")
+        status, _ = self.requisitar("POST", f"/jobs/{job_id}/falha", {"acao": "talvez"})
+        self.assertEqual(status, 400)
+        status, _ = self.requisitar("POST", f"/jobs/{job_id}/falha", {"acao": "tentar_novamente"})
+        self.assertEqual(status, 200)
+        self.aguardar_checkpoint(job_id, "revisao")
+        status, documento = self.requisitar("GET", f"/jobs/{job_id}/documento")
+        self.assertIn("## 1.1. Introdução Abrangente", documento)
+
+    def test_resposta_repetida_ao_checkpoint(self):
+        job_id = self.criar_documento("Repetida")
+        self.aguardar_checkpoint(job_id, "revisao")
+        status, job = self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "continuar"})
+        self.assertEqual(status, 200)
+        self.assertIsNone(job["checkpoint"])
+        status, _ = self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "continuar"})
+        self.assertEqual(status, 409)
+
+    def test_checkpoint_expirado(self):
+        self.tearDown()
+        self.iniciar(ModeloStub(), prazo_checkpoint=0.2)
+        job_id = self.criar_documento()
+        self.aguardar_checkpoint(job_id, "revisao")
+        job = self.aguardar_estado(job_id, "falhou")
+        self.assertIn("CheckpointExpirado", job["erro"])
+        self.assertIsNone(job["checkpoint"])
+        self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "continuar"})[0], 409)
+
+    def test_cancelar_job(self):
+        bloqueado = self.criar_documento("Em revisão")
+        self.aguardar_checkpoint(bloqueado, "revisao")
+        status, job = self.requisitar("DELETE", f"/jobs/{bloqueado}")
+        self.assertEqual(status, 200)
+        self.assertEqual(job["estado"], "cancelado")
+        self.assertIsNone(job["checkpoint"])
+        self.assertEqual(self.requisitar("POST", f"/jobs/{bloqueado}/revisao", {"acao": "continuar"})[0], 409)
+        # As vagas devolvidas continuam valendo: dois jobs novos ainda chegam ao checkpoint.
+        for tema in ("A", "B"):
+            self.aguardar_checkpoint(self.criar_documento(tema), "revisao")
+        self.assertEqual(self.requisitar("DELETE", f"/jobs/{bloqueado}")[0], 200)
+        self.assertEqual(self.requisitar("GET", f"/jobs/{bloqueado}")[0], 404)
+        self.assertEqual(self.requisitar("DELETE", f"/jobs/{bloqueado}/revisao")[0], 404)
+
+    def test_erros_de_requisicao(self):
+        job_id = self.criar_documento("Erros")
+        self.aguardar_checkpoint(job_id, "revisao")
+        self.assertEqual(self.requisitar("POST", "/jobs/documento", {})[0], 400)
+        self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "adicionar_secao",
+                                                                            "titulo": "X"})[0], 400)
+        self.assertEqual(self.requisitar("GET", f"/jobs/{job_id}/eventos?desde=abc")[0], 400)
+        self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/revisao", None, {"Content-Length": "zz"})[0], 400)
+        self.assertEqual(self.requisitar("GET", "/jobs/000000000000")[0], 404)
+        self.assertEqual(self.requisitar("GET", "/rota-inexistente")[0], 404)
+        self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/traducao", {"idiomas": []})[0], 409)
+        self.assertEqual(self.requisitar("POST", "/jobs/documento", {"tema": 123})[0], 400)
+        briefing = {campo: "x" for campo in CAMPOS_BRIEFING + ["objetivo_principal"]}
+        self.assertEqual(self.requisitar("POST", "/jobs/copy", dict(briefing, nome_marca=["X"]))[0], 400)
+        self.assertEqual(self.requisitar("POST", f"/jobs/{job_id}/revisao", {"acao": "adicionar_secao",
+                                                                            "titulo": {"a": 1},
+                                                                            "pesquisa": "x"})[0], 400)
+        status, jobs = self.requisitar("GET", "/jobs")
+        self.assertEqual([j["id"] for j in jobs], [job_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
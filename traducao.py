@@ -0,0 +1,23 @@
+from typing import List
+
+# ==============================================================================
+#           DIVISÃO DE TEXTO PARA TRADUÇÃO
+# ==============================================================================
+# Compartilhado pelos geradores de documento e de copy (main.py, CopyWriting.py e servidor.py).
+
+LIMITE_BLOCO_TRADUCAO = 4000
+
+
+def dividir_em_blocos(texto: str, limite: int = LIMITE_BLOCO_TRADUCAO) -> List[str]:
+    """Divide o texto em blocos de até `limite` caracteres, sem quebrar parágrafos (usado na tradução)."""
+    blocos = []
+    chunk_atual = ""
+    for p in texto.split('\n'):
+        if len(chunk_atual) + len(p) + 1 > limite:
+            blocos.append(chunk_atual)
+            chunk_atual = p
+        else:
+            chunk_atual += "\n" + p
+    if chunk_atual:
+        blocos.append(chunk_atual)
+    return blocos